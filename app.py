@@ -1,6 +1,10 @@
-import json
+import pickle
+from pathlib import Path
+
+import orjson
+import pandas as pd
 import streamlit as st
-from rapidfuzz import process
+from rapidfuzz import fuzz, process, utils
 from collections import defaultdict
 
 # Set page config
@@ -10,17 +14,89 @@ st.set_page_config(
     layout="wide"
 )
 
+def _build_name_trie(processed_names):
+    """Build a character trie over processed food names for prefix lookups."""
+    trie = {}
+    for position, name in enumerate(processed_names):
+        node = trie
+        for char in name:
+            node = node.setdefault(char, {})
+        node[None] = position  # end-of-name marker, indexes the names tuple
+    return trie
+
 # Load data from data.json
-@st.cache_data
+@st.cache_resource
 def load_data():
-    json_path = r"C:\Users\ADMIN\OneDrive\Desktop\Ameya\second_web\data.json"
+    """Load the food database and the search indexes derived from it.
+    
+    The result is shared across sessions without copying, so it must be
+    treated as read-only.
+    """
+    json_path = Path(__file__).with_name("data.json")
+    # Prefer the snapshot from scripts/precompile_data.py unless data.json is newer
+    pickle_path = json_path.with_suffix(".pkl")
+    data = None
     try:
-        with open(json_path, 'r') as f:
-            data = json.load(f)
-        return data
-    except FileNotFoundError:
-        st.error(f"Could not find data.json at {json_path}")
-        st.stop()
+        if pickle_path.exists() and (
+            not json_path.exists() or pickle_path.stat().st_mtime >= json_path.stat().st_mtime
+        ):
+            data = pickle.loads(pickle_path.read_bytes())
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, IndexError, ValueError):
+        # A truncated or incompatible snapshot falls back to data.json
+        data = None
+    if data is None:
+        try:
+            data = orjson.loads(json_path.read_bytes())
+        except FileNotFoundError:
+            st.error(f"Could not find data.json at {json_path}")
+            st.stop()
+    
+    foods = data['foods']
+    component_bits = _static_tables()['component_bits']
+    for food in foods.values():
+        # Ingredient categories, derived once instead of on every rerun
+        food['_primary_cats'] = frozenset(info['category'] for info in food['primary_ingredients'].values())
+        food['_opt_cat'] = {name: info['category'] for name, info in food['optional_ingredients'].items()}
+        food['_primary_mask'] = _category_mask(food['_primary_cats'], component_bits)
+        food['_opt_mask'] = {name: component_bits.get(category, 0) for name, category in food['_opt_cat'].items()}
+    names = tuple(foods)
+    # Normalized once so searches only have to process the query
+    processed_names = tuple(utils.default_process(name) for name in names)
+    return {
+        "foods": foods,
+        "names": names,
+        "processed_names": processed_names,
+        # Processed name -> food name, for exact lookups that skip fuzzy matching
+        "processed_index": dict(zip(processed_names, names)),
+        "trie": _build_name_trie(processed_names),
+    }
+
+def _unique_prefix_match(trie, prefix):
+    """Return the position of the only processed name starting with `prefix`, else None."""
+    node = trie
+    for char in prefix:
+        node = node.get(char)
+        if node is None:
+            return None
+    # A single match is a chain of one-child nodes ending at its end marker
+    while len(node) == 1:
+        key, child = next(iter(node.items()))
+        if key is None:
+            return child
+        node = child
+    return None
+
+# Ingredient table for a food, built once per food and ingredient kind
+@st.cache_data
+def _ingredients_df(food_name, kind, _ingredients):
+    df = pd.DataFrame.from_dict(_ingredients, orient='index')
+    df = df[['quantity_per_serving', 'category', 'calorific_value']].rename(columns={
+        'quantity_per_serving': "Quantity",
+        'category': "Category",
+        'calorific_value': "Calories"
+    })
+    df['Calories'] = df['Calories'].astype(str) + " kcal"
+    return df.rename_axis("Ingredient").reset_index()
 
 # Define dietary indices and their components
 dietary_indices = {
@@ -80,49 +156,78 @@ dietary_indices = {
     }
 }
 
-def calculate_dietary_scores(food_data, selected_optionals):
-    """Calculate dietary scores based on food ingredients and selected optionals."""
-    # Collect categories from primary and selected optional ingredients
-    categories = set()
-    
-    # Add primary ingredient categories
-    for name, info in food_data['primary_ingredients'].items():
-        categories.add(info['category'])
+def _category_mask(categories, component_bits):
+    """Encode categories as a bitmask over component_bits (unknown categories are ignored)."""
+    mask = 0
+    for category in categories:
+        mask |= component_bits.get(category, 0)
+    return mask
+
+# Tables derived from dietary_indices, built once per process rather than on
+# every rerun of the script
+@st.cache_resource
+def _static_tables():
+    # One bit per component referenced by any index; sorted so bit positions
+    # are deterministic
+    component_bits = {
+        component: 1 << bit
+        for bit, component in enumerate(sorted({c for info in dietary_indices.values() for c in info['components']}))
+    }
+    return {
+        "component_bits": component_bits,
+        # Component mask per index, so scoring is a popcount of an AND
+        "index_masks": {
+            index: (_category_mask(info['components'], component_bits), info['max_score'], "Energy (kcal)" in info['components'])
+            for index, info in dietary_indices.items()
+        },
+        # Percentage = score * scale, so the per-click divide becomes a multiply
+        "pct_scale": {index: 100.0 / info['max_score'] for index, info in dietary_indices.items()},
+    }
+
+def _collect_categories(food_data, selected_optionals):
+    """Collect categories from primary and selected optional ingredients."""
+    optional_categories = food_data['_opt_cat']
+    return food_data['_primary_cats'] | {optional_categories[name] for name in selected_optionals}
+
+@st.cache_data(max_entries=512)
+def calculate_dietary_scores(food_name, selected_optionals):
+    """Calculate dietary scores based on food ingredients and selected optionals.
     
-    # Add selected optional ingredient categories
-    for name, info in food_data['optional_ingredients'].items():
-        if name in selected_optionals:
-            categories.add(info['category'])
+    Takes the food name and a frozenset of optionals so repeated calculations
+    are served from the cache. Returns the (index, score, max_score) list and
+    the food's categories, which the detailed breakdown reuses.
+    """
+    food_data = load_data()['foods'][food_name]
+    categories = _collect_categories(food_data, selected_optionals)
+    food_mask = food_data['_primary_mask']
+    for name in selected_optionals:
+        food_mask |= food_data['_opt_mask'][name]
     
     # Calculate scores for each dietary index
     scores = []
-    for index, info in dietary_indices.items():
-        index_components = info['components']
-        max_score = info['max_score']
-        score = sum(1 for comp in index_components if comp in categories)
+    for index, (index_mask, max_score, has_energy) in _static_tables()['index_masks'].items():
+        score = (food_mask & index_mask).bit_count()
         
         # Add Energy (kcal) if total calories are present (all foods in data.json have this)
-        if "Energy (kcal)" in index_components:
+        if has_energy:
             score += 1  # Since all foods have a total_serving_calories
             
         scores.append((index, score, max_score))
     
-    return scores
+    return scores, categories
 
 def main():
     st.title("🥗 Dietary Score Calculator")
     st.markdown("Calculate dietary scores for foods based on various dietary indices.")
     
     # Load data
-    data = load_data()
-    foods = data['foods']
-    food_names = list(foods.keys())
+    db = load_data()
+    foods = db['foods']
+    food_names = db['names']
     
     # Initialize session state
     if 'selected_food' not in st.session_state:
         st.session_state.selected_food = None
-    if 'food_data' not in st.session_state:
-        st.session_state.food_data = None
     
     # Food selection section
     st.header("1. Select a Food")
@@ -141,24 +246,45 @@ def main():
     
     # Search functionality
     if search_button and user_input:
-        # Fuzzy match to find the closest food name
-        best_match = process.extractOne(user_input, food_names)
-        if best_match and best_match[1] >= 50:  # Threshold for match confidence
-            st.session_state.selected_food = best_match[0]
-            st.session_state.food_data = foods[best_match[0]]
-            if best_match[1] < 100:
-                st.info(f"Found closest match: **{best_match[0]}** (confidence: {best_match[1]:.1f}%)")
+        # Normalize the query once; every index below is keyed on processed names
+        query = utils.default_process(user_input)
+        exact_match = db['processed_index'].get(query)
+        if exact_match:
+            # Exact hit, no need to score every food name
+            match_name, confidence = exact_match, 100
+        else:
+            # A prefix is accepted only when it names one food; ambiguous or
+            # unknown prefixes go through the thresholded fuzzy scan over all names
+            position = _unique_prefix_match(db['trie'], query) if query else None
+            if position is not None:
+                # WRatio is prefix-aware, so a partial name still gets a sensible confidence
+                confidence = fuzz.WRatio(query, db['processed_names'][position], processor=None)
+                best_match = (db['processed_names'][position], confidence, position)
             else:
-                st.success(f"Exact match found: **{best_match[0]}**")
+                # Fuzzy match to find the closest food name
+                best_match = process.extractOne(
+                    query,
+                    db['processed_names'],
+                    processor=None,
+                    scorer=fuzz.ratio,
+                    score_cutoff=50  # Threshold for match confidence
+                )
+            match_name, confidence = (food_names[best_match[2]], best_match[1]) if best_match else (None, 0)
+        
+        if match_name:
+            st.session_state.selected_food = match_name
+            if confidence < 100:
+                st.info(f"Found closest match: **{match_name}** (confidence: {confidence:.1f}%)")
+            else:
+                st.success(f"Exact match found: **{match_name}**")
         else:
             st.error(f"No close match found for '{user_input}'. Please try a different food name.")
             st.session_state.selected_food = None
-            st.session_state.food_data = None
     
     # Display food information if selected
-    if st.session_state.selected_food and st.session_state.food_data:
+    if st.session_state.selected_food:
         food_name = st.session_state.selected_food
-        food_data = st.session_state.food_data
+        food_data = foods[food_name]
         
         st.header(f"2. Food Information: {food_name}")
         
@@ -171,17 +297,11 @@ def main():
         
         # Primary ingredients
         st.subheader("Primary Ingredients")
-        primary_ingredients_data = []
-        for name, info in food_data['primary_ingredients'].items():
-            primary_ingredients_data.append({
-                "Ingredient": name,
-                "Quantity": info['quantity_per_serving'],
-                "Category": info['category'],
-                "Calories": f"{info['calorific_value']} kcal"
-            })
-        
-        if primary_ingredients_data:
-            st.dataframe(primary_ingredients_data, use_container_width=True)
+        if food_data['primary_ingredients']:
+            st.dataframe(
+                _ingredients_df(food_name, 'primary', food_data['primary_ingredients']),
+                use_container_width=True
+            )
         
         # Optional ingredients selection
         st.subheader("3. Optional Ingredients")
@@ -189,19 +309,19 @@ def main():
         
         selected_optionals = []
         if food_data['optional_ingredients']:
-            # Create columns for better layout
-            num_cols = 2
-            cols = st.columns(num_cols)
+            st.dataframe(
+                _ingredients_df(food_name, 'optional', food_data['optional_ingredients']),
+                use_container_width=True
+            )
             
-            optional_items = list(food_data['optional_ingredients'].items())
-            for i, (name, info) in enumerate(optional_items):
-                with cols[i % num_cols]:
-                    if st.checkbox(
-                        f"{name}",
-                        key=f"opt_{name}",
-                        help=f"Quantity: {info['quantity_per_serving']}, Category: {info['category']}, Calories: {info['calorific_value']} kcal"
-                    ):
-                        selected_optionals.append(name)
+            # A single widget, so each change is one state update instead of N checkboxes
+            optional_categories = food_data['_opt_cat']
+            selected_optionals = st.multiselect(
+                "Optional ingredients",
+                options=list(optional_categories),
+                format_func=lambda name: f"{name} ({optional_categories[name]})",
+                key=f"opt_{food_name}"
+            )
         else:
             st.info("No optional ingredients available for this food.")
         
@@ -212,70 +332,47 @@ def main():
             # Show selected optional ingredients
             if selected_optionals:
                 st.subheader("Selected Optional Ingredients:")
-                for ingredient in selected_optionals:
-                    st.write(f"• {ingredient}")
+                st.markdown("\n\n".join(f"• {ingredient}" for ingredient in selected_optionals))
             
             # Calculate scores
-            scores = calculate_dietary_scores(food_data, selected_optionals)
+            scores, categories = calculate_dietary_scores(food_name, frozenset(selected_optionals))
             
             # Display results
             st.subheader("Results")
             st.markdown("Scores based on matched food and nutrient components for each dietary index.")
             st.info("Note: Limited nutrient data may affect accuracy.")
             
-            # Create results table
-            results_data = []
-            for index, score, max_score in scores:
-                percentage = (score / max_score) * 100
-                results_data.append({
-                    "Dietary Index": index,
-                    "Score": f"{score}/{max_score}",
-                    "Percentage": f"{percentage:.1f}%"
-                })
-            
-            st.dataframe(results_data, use_container_width=True)
-            
-            # Create a bar chart
-            st.subheader("Score Visualization")
-            chart_data = {}
-            for index, score, max_score in scores:
-                chart_data[index] = (score / max_score) * 100
-            
-            st.bar_chart(chart_data)
+            # Results table with the percentage drawn as an inline bar
+            pct_scale = _static_tables()['pct_scale']
+            results_df = pd.DataFrame({
+                "Dietary Index": [index for index, _, _ in scores],
+                "Score": [f"{score}/{max_score}" for _, score, max_score in scores],
+                "Percentage": [score * pct_scale[index] for index, score, _ in scores]
+            })
+            st.dataframe(
+                results_df,
+                column_config={
+                    "Percentage": st.column_config.ProgressColumn(
+                        "Percentage", format="%.1f%%", min_value=0, max_value=100
+                    )
+                },
+                use_container_width=True,
+                hide_index=True
+            )
             
             # Show detailed breakdown
             with st.expander("View Detailed Breakdown"):
                 st.subheader("Matched Categories")
-                categories = set()
-                
-                # Add primary ingredient categories
-                for name, info in food_data['primary_ingredients'].items():
-                    categories.add(info['category'])
-                
-                # Add selected optional ingredient categories
-                for name, info in food_data['optional_ingredients'].items():
-                    if name in selected_optionals:
-                        categories.add(info['category'])
-                
-                st.write("**Categories found in this food:**")
-                for category in sorted(categories):
-                    st.write(f"• {category}")
+                st.markdown("**Categories found in this food:**\n\n" + "\n\n".join(f"• {category}" for category in sorted(categories)))
                 
-                # Show which components matched for each index
+                # Show which components matched for each index, one message per index
                 for index, info in dietary_indices.items():
-                    st.write(f"\n**{index} Components:**")
-                    matched_components = []
-                    for comp in info['components']:
-                        if comp in categories:
-                            matched_components.append(f"✅ {comp}")
-                        else:
-                            matched_components.append(f"❌ {comp}")
-                    
+                    components = info['components']
                     # Show only first 10 components to avoid clutter
-                    for comp in matched_components[:10]:
-                        st.write(f"  {comp}")
-                    if len(matched_components) > 10:
-                        st.write(f"  ... and {len(matched_components) - 10} more components")
+                    lines = [("✅ " if comp in categories else "❌ ") + comp for comp in components[:10]]
+                    if len(components) > 10:
+                        lines.append(f"... and {len(components) - 10} more components")
+                    st.markdown(f"**{index} Components:**\n\n" + "\n\n".join(lines))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
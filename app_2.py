@@ -1,9 +1,11 @@
-import json
+from pathlib import Path
 import streamlit as st
-from rapidfuzz import process
+from rapidfuzz import fuzz, process, utils
+from bisect import bisect_left
+import html
 from collections import defaultdict
-import pandas as pd
-import plotly.express as px
+from itertools import takewhile
+import orjson
 
 # Set page config with dark theme
 st.set_page_config(
@@ -14,7 +16,7 @@ st.set_page_config(
 )
 
 # Force dark theme with custom CSS
-st.markdown("""
+_CSS = """
 <style>
     /* Force dark theme */
     .stApp {
@@ -46,34 +48,170 @@ st.markdown("""
     .css-1d391kg { /* sidebar */
         background-color: #262730 !important;
     }
-    .js-plotly-plot {
-        background-color: #0e1117 !important;
-    }
 </style>
-""", unsafe_allow_html=True)
+"""
 
-# -- Data loading & definitions here (unchanged) --
-@st.cache_data
-def load_data():
-    json_path = "data.json"
+# Load data from data.json
+DATA_PATH = Path(__file__).with_name("data.json")
+
+def _data_version():
+    """Modification time of data.json, so the persisted cache is keyed on its contents."""
+    try:
+        return DATA_PATH.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+# Only the current version is read back; older entries are dropped from memory
+@st.cache_data(persist="disk", show_spinner=False, max_entries=2)
+def load_data(data_version):
     try:
-        with open(json_path, 'r') as f:
-            return json.load(f)
+        data = orjson.loads(DATA_PATH.read_bytes())
+        # Names ride along so reruns and downstream caches reuse one hashable tuple
+        return data, tuple(data['foods'].keys())
     except FileNotFoundError:
-        st.error(f"Could not find data.json at {json_path}")
+        st.error(f"Could not find data.json at {DATA_PATH}")
         st.stop()
 
+# Normalize food names once so each search only processes the query; shared
+# read-only across sessions, so it is not copied on every access
+@st.cache_resource
+def _prep_choices(names):
+    return tuple(utils.default_process(n) for n in names), names
+
+# Names sorted by their normalized form, for O(log N) prefix lookups
+@st.cache_resource
+def _name_index(names):
+    processed, originals = _prep_choices(names)
+    order = sorted(range(len(names)), key=processed.__getitem__)
+    return [originals[i] for i in order], [processed[i] for i in order]
+
+def _prefix_search(q, names):
+    """Return (name, score) when the query is an exact name or an unambiguous prefix."""
+    q = utils.default_process(q)
+    if not q:
+        return None
+    sorted_names, sorted_lower = _name_index(names)
+    lo = bisect_left(sorted_lower, q)
+    hits = list(takewhile(lambda n: n.startswith(q), sorted_lower[lo:lo+10]))
+    if q in hits:
+        best = hits.index(q)
+    elif len(hits) == 1:
+        best = 0
+    else:
+        # No hits, or several equally good prefixes: let fuzzy search decide
+        return None
+    return sorted_names[lo + best], fuzz.WRatio(q, hits[best])
+
+# Repeated queries are answered from the cache without rescoring
+@st.cache_data(max_entries=1024)
+def _fuzzy_search(q, names):
+    processed, originals = _prep_choices(names)
+    # A (1, N) cdist row scores every name in one C++ call; batched queries
+    # can pass more rows through the same path
+    row = process.cdist(
+        [utils.default_process(q)], processed,
+        processor=None, scorer=fuzz.WRatio, score_cutoff=50, workers=-1
+    )[0]
+    best = int(row.argmax())
+    return (originals[best], float(row[best])) if row[best] >= 50 else None
+
+def _html_table(rows, cols):
+    """Render small, non-interactive tables as plain HTML (no Arrow/grid overhead)."""
+    head = '<tr>' + ''.join(f'<th>{html.escape(c)}</th>' for c in cols) + '</tr>'
+    body = ''.join(
+        '<tr>' + ''.join(f'<td>{html.escape(str(r[c]))}</td>' for c in cols) + '</tr>'
+        for r in rows
+    )
+    return f'<table>{head}{body}</table>'
+
+# Primary ingredient table, built once per food
+@st.cache_data
+def _primary_table(food_name, data_version, _primary_ingredients):
+    return _html_table(
+        ({
+            "Ingredient": n,
+            "Quantity": i['quantity_per_serving'],
+            "Category": i['category'],
+            "Calories": f"{i['calorific_value']} kcal"
+        } for n, i in _primary_ingredients.items()),
+        ["Ingredient", "Quantity", "Category", "Calories"]
+    )
+
 # ... dietary_indices, reverse_scored_components, component_explanations, negative_explanations ...
 # ... normalize_category, calculate_dietary_scores, get_doctor_explanation ...
 
+# Scores keyed on the food, data version and sorted optionals, so reruns with the same
+# inputs skip component matching and the food dict is never hashed
+@st.cache_data(show_spinner=False)
+def _scores_cached(food_name, data_version, optionals):
+    data, _ = load_data(data_version)
+    return calculate_dietary_scores(data['foods'][food_name], list(optionals))
+
+# Normalized categories per food, built the first time its summary is shown
+@st.cache_data
+def _food_categories(food_name, data_version, _food_data):
+    primary = frozenset(normalize_category(i['category']) for i in _food_data['primary_ingredients'].values())
+    optional = {n: normalize_category(i['category']) for n, i in _food_data['optional_ingredients'].items()}
+    return primary, optional
+
+# Results only rerun this fragment when Calculate is clicked, not the whole page
+@st.fragment
+def _results_fragment(food_name, data_version, food_data, selected_optionals):
+    if st.button("📊 Calculate Dietary Scores", type="primary"):
+        # Imported here so first paint and search-only reruns skip the cost
+        import pandas as pd
+
+        st.header("4. Dietary Scores")
+        if selected_optionals:
+            st.markdown("**Selected Optionals:** " + ", ".join(selected_optionals))
+
+        scores = _scores_cached(food_name, data_version, tuple(sorted(selected_optionals)))
+        # One score table, sorted once, feeds the results table, chart and analysis
+        df = pd.DataFrame(scores, columns=["Dietary Index", "score", "max_score", "comps"])
+        df["Percentage"] = df["score"] / df["max_score"] * 100
+        df["Score"] = df["score"].astype(str) + "/" + df["max_score"].astype(str)
+        df["Matched Components"] = df["comps"].map(len)
+        df = df.sort_values("Percentage", ascending=False)
+
+        # Results table
+        results = [{
+            "Dietary Index": i,
+            "Score": score,
+            "Percentage": f"{pct:.1f}%",
+            "Matched Components": n
+        } for i, score, pct, n in df[["Dietary Index", "Score", "Percentage", "Matched Components"]].itertuples(index=False, name=None)]
+        st.markdown(_html_table(results, ["Dietary Index", "Score", "Percentage", "Matched Components"]), unsafe_allow_html=True)
+
+        # Bar chart
+        st.bar_chart(df.set_index("Dietary Index")["Percentage"], height=500)
+
+        # Detailed analysis
+        with st.expander("📋 Detailed Health Assessment"):
+            st.markdown("### Professional Dietary Analysis")
+            analysis_rows = df[["Dietary Index", "score", "max_score", "comps", "Percentage"]].itertuples(index=False, name=None)
+            st.markdown("\n\n---\n\n".join(
+                f"## {i}\n{get_doctor_explanation(i, s, m, comps, pct)}"
+                for i, s, m, comps, pct in analysis_rows
+            ) + "\n\n---")
+
+            # Summary of categories
+            st.markdown("### Summary of Your Food's Components")
+            primary_cats, opt_cat = _food_categories(food_name, data_version, food_data)
+            categories = primary_cats | {opt_cat[n] for n in selected_optionals}
+
+            st.markdown("\n\n".join(f"• {cat.title()}" for cat in sorted(categories)))
+
 def main():
+    # Re-emitted every run: Streamlit drops elements a rerun does not render
+    st.markdown(_CSS, unsafe_allow_html=True)
     st.title("🥗 Dietary Score Calculator")
     st.markdown("Calculate dietary scores for foods based on various dietary indices.")
 
     # 1. Load data
-    data = load_data()
+    data_version = _data_version()
+    data, food_names = load_data(data_version)
     foods = data['foods']
-    food_names = list(foods.keys())
+    st.session_state.setdefault('selected_food', None)
 
     # 2. Food selection
     st.header("1. Select a Food")
@@ -84,21 +222,24 @@ def main():
         search_button = st.button("🔍 Search", type="primary")
 
     if search_button and user_input:
-        best_match = process.extractOne(user_input, food_names)
-        if best_match and best_match[1] >= 50:
-            st.session_state.selected_food = best_match[0]
-            st.session_state.food_data = foods[best_match[0]]
-            msg = "Exact match found" if best_match[1]==100 else f"Found closest match: **{best_match[0]}** (confidence: {best_match[1]:.1f}%)"
+        # Exact prefixes resolve by bisection; fuzzy scoring only runs when none match
+        best_match = _prefix_search(user_input, food_names) or _fuzzy_search(user_input, food_names)
+        if best_match:
+            match_name = best_match[0]
+            st.session_state.selected_food = match_name
+            msg = "Exact match found" if best_match[1]==100 else f"Found closest match: **{match_name}** (confidence: {best_match[1]:.1f}%)"
             st.success(msg)
         else:
             st.error(f"No close match for '{user_input}'")
             st.session_state.selected_food = None
-            st.session_state.food_data = None
 
     # 3. Show food info
-    if st.session_state.get('selected_food'):
-        food_name = st.session_state.selected_food
-        food_data = st.session_state.food_data
+    food_name = st.session_state.selected_food
+    food_data = foods.get(food_name) if food_name else None
+    if food_name and food_data is None:
+        # Selection outlived an edit to data.json that removed the food
+        st.session_state.selected_food = None
+    if food_data:
 
         st.header(f"2. Food Information: {food_name}")
         c1, c2 = st.columns(2)
@@ -108,77 +249,16 @@ def main():
             st.metric("Total Calories", f"{food_data['total_serving_calories']} kcal")
 
         # Primary ingredients table
-        primary_list = [{
-            "Ingredient": n,
-            "Quantity": i['quantity_per_serving'],
-            "Category": i['category'],
-            "Calories": f"{i['calorific_value']} kcal"
-        } for n, i in food_data['primary_ingredients'].items()]
-        if primary_list:
-            st.dataframe(primary_list, use_container_width=True)
+        if food_data['primary_ingredients']:
+            st.markdown(_primary_table(food_name, data_version, food_data['primary_ingredients']), unsafe_allow_html=True)
 
         # Optional ingredients
         st.subheader("3. Optional Ingredients")
-        selected_optionals = []
-        opt_items = list(food_data['optional_ingredients'].items())
-        cols = st.columns(2)
-        for idx, (name, info) in enumerate(opt_items):
-            with cols[idx % 2]:
-                if st.checkbox(f"{name}", key=f"opt_{name}"):
-                    selected_optionals.append(name)
+        opt_names = list(food_data['optional_ingredients'].keys())
+        selected_optionals = st.multiselect("Optional ingredients", opt_names, key=f"opt_{food_name}")
 
         # 4. Calculate and display
-        if st.button("📊 Calculate Dietary Scores", type="primary"):
-            st.header("4. Dietary Scores")
-            if selected_optionals:
-                st.markdown("**Selected Optionals:** " + ", ".join(selected_optionals))
-
-            scores = calculate_dietary_scores(food_data, selected_optionals)
-            scores_pct = [(i, s, m, comps, s/m*100) for i,s,m,comps in scores]
-            scores_pct.sort(key=lambda x: x[4], reverse=True)
-
-            # Results table
-            results = [{
-                "Dietary Index": i,
-                "Score": f"{s}/{m}",
-                "Percentage": f"{pct:.1f}%",
-                "Matched Components": len(comps)
-            } for i,s,m,comps,pct in scores_pct]
-            st.dataframe(results, use_container_width=True)
-
-            # Bar chart
-            df = pd.DataFrame({
-                "Dietary Index": [i for i, *_ in scores_pct],
-                "Percentage": [pct for *_, pct in scores_pct]
-            })
-            fig = px.bar(df, x="Dietary Index", y="Percentage")
-            fig.update_layout(
-                plot_bgcolor='#0e1117',
-                paper_bgcolor='#0e1117',
-                font_color='#fafafa'
-            )
-            fig.update_xaxes(color='#fafafa', gridcolor='#4a4a4a')
-            fig.update_yaxes(color='#fafafa', gridcolor='#4a4a4a')
-            st.plotly_chart(fig, use_container_width=True)
-
-            # Detailed analysis
-            with st.expander("📋 Detailed Health Assessment"):
-                st.markdown("### Professional Dietary Analysis")
-                for i, s, m, comps, pct in scores_pct:
-                    st.markdown(f"## {i}")
-                    st.markdown(get_doctor_explanation(i, s, m, comps, pct))
-                    st.markdown("---")
-
-                # Summary of categories
-                st.markdown("### Summary of Your Food's Components")
-                categories = set()
-                for info in food_data['primary_ingredients'].values():
-                    categories.add(normalize_category(info['category']))
-                for name in selected_optionals:
-                    categories.add(normalize_category(food_data['optional_ingredients'][name]['category']))
-
-                for cat in sorted(categories):
-                    st.write(f"• {cat.title()}")
+        _results_fragment(food_name, data_version, food_data, selected_optionals)
 
 if __name__ == "__main__":
-    main()
+    main()
\ No newline at end of file
@@ -0,0 +1,28 @@
+"""Snapshot data.json as data.pkl so the app can skip JSON parsing on cold start.
+
+Run from anywhere after editing data.json:
+
+    python scripts/precompile_data.py
+"""
+import os
+import pickle
+from pathlib import Path
+
+import orjson
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def main():
+    data = orjson.loads((ROOT / "data.json").read_bytes())
+    target = ROOT / "data.pkl"
+    # Write beside the target and swap it in, so the app never reads a partial file
+    tmp = target.with_suffix(".pkl.tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(data, f, protocol=5)
+    os.replace(tmp, target)
+    print(f"Wrote {target} ({len(data['foods'])} foods)")
+
+
+if __name__ == "__main__":
+    main()